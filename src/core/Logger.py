@@ -1,15 +1,96 @@
+import queue
+import sys
+import threading
 from loguru import logger as logguru_logger
 from pathlib import Path
 
 
+class BoundedQueueSink:
+    """
+    A Loguru sink that hands formatted records to a background thread writing a
+    size-rotated log file, through a bounded queue.
+
+    Loguru's own `enqueue=True` uses an unbounded queue, so a sink that cannot
+    keep up makes memory grow without limit. Here, once `maxsize` records are
+    pending, new records are dropped and counted instead.
+
+    The sink owns its file handle, so removing it from Loguru (e.g. when another
+    LoggerManager calls `logger.remove()`) closes the file instead of leaving a
+    second writer behind.
+    """
+
+    def __init__(self, path:Path, rotation:int=1_000_000, retention:int=5, maxsize:int=10_000):
+        """
+        Open the log file and start the writer thread.
+
+        Args:
+            path (Path): The log file. Rotated copies are kept next to it as
+                `<name>.1` (newest) to `<name>.<retention>` (oldest).
+            rotation (int): Rotate once the file reaches this many bytes (default: 1_000_000).
+            retention (int): Number of rotated files to keep (default: 5).
+            maxsize (int): Maximum number of pending records (default: 10_000).
+        """
+        self.path = path
+        self.rotation = rotation
+        self.retention = retention
+        self._file = open(path, "a", encoding="utf-8")
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        """Queue a formatted record, dropping it if the queue is full."""
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, message:str):
+        self._file.write(message)
+        if self._file.tell() >= self.rotation:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.retention - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.retention > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _drain(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            self._write(message)
+            if self._queue.empty():
+                self._file.flush()
+
+    def stop(self):
+        """Flush pending records, stop the writer and close the file (called by Loguru on removal)."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped:
+            self._write(f"BoundedQueueSink: dropped {self.dropped} log records (queue full)\n")
+        self._file.close()
+
+
 class LoggerManager:
     """
     A centralized logger manager for the RAG pipeline.
 
     This class configures a Loguru logger to:
     - Ensure a log directory exists
-    - Write logs to a rotating file (logging_project.log)
-    - Also print logs to the console
+    - Write logs to a rotating file (logging_project.log) through a bounded queue
+    - Also write logs to the console (stderr)
     """
 
     def __init__(self, log_dir:Path, level:str ="INFO"):
@@ -27,17 +108,18 @@ class LoggerManager:
 
         logguru_logger.remove()
 
+        # The rotating file is written by a background thread fed through a
+        # bounded queue, so a slow disk cannot grow the backlog without limit.
         logfile = self.log_dir/"logging_project.log"
         logguru_logger.add(
-            logfile,
-            rotation="1 MB",
-            retention=5,
+            BoundedQueueSink(logfile, rotation=1_000_000, retention=5),
             level=self.level,
-            enqueue=True
+            format="{time:YYYY-MM-DD HH:mm:ss.SSS} {level} {message}",
+            colorize=False
         )
 
         logguru_logger.add(
-            lambda msg: print(msg, end=""),
+            sys.stderr,
             level=self.level
         )
         self.logger = logguru_logger
@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from diskcache import Cache
+
+
+class SemanticCache:
+    """
+    A question -> answer cache that matches on meaning, not exact text.
+
+    Questions are stored with their L2-normalized embedding. A new question is a
+    hit when its cosine similarity to a cached question is at least `threshold`,
+    so rephrasings of an FAQ-style question skip retrieval and generation.
+
+    Entries expire after `ttl` seconds, and the least recently used entry is
+    evicted once `maxsize` entries are stored.
+
+    Lookups run against an in-memory matrix. When a diskcache `store` is given,
+    every entry is also written there and the cache is reloaded from it on
+    construction, so one-shot processes (e.g. `python -m src.main answer`) hit
+    answers cached by earlier runs. Entries written by other processes after
+    this one started are not seen until the next construction. Each cache only
+    reads and writes the entries of its own `namespace`, so separate users
+    sharing one store never see each other's answers.
+
+    Example:
+        >>> cache = SemanticCache(threshold=0.95, store=Cache("storage/answer_cache"),
+        ...                       namespace=("semantic", user_id))
+        >>> cache.insert("What is HCL?", vec, "HCL is ...")
+        >>> cache.lookup(other_vec)   # answer if similar enough, else None
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 1024, ttl: float = 3600.0,
+                 store: Optional[Cache] = None, namespace: tuple = ("semantic",)):
+        """
+        Args:
+            threshold (float): Minimum cosine similarity for a hit (default: 0.95).
+            maxsize (int): Maximum number of cached questions (default: 1024).
+            ttl (float): Entry lifetime in seconds (default: 3600).
+            store (Cache, optional): diskcache Cache to persist entries in. None
+                keeps the cache in memory.
+            namespace (tuple): Prefix of this cache's keys in `store`; entries
+                are stored as `(*namespace, question)`, so the store can be
+                shared with other caches (default: ("semantic",)).
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.namespace = tuple(namespace)
+        # question -> (matrix row, answer, insertion time), in LRU order
+        self._entries = OrderedDict()
+        # (maxsize, dim) unit embeddings, allocated on the first insert. Free
+        # rows are masked out of lookups through `_used`.
+        self._vecs = None
+        self._used = np.zeros(maxsize, dtype=bool)
+        self._questions = [None] * maxsize
+        self._free = list(range(maxsize - 1, -1, -1))
+        if store is not None:
+            self._load()
+
+    def _load(self):
+        found = []
+        for key in self.store.iterkeys():
+            if isinstance(key, tuple) and key[:-1] == self.namespace:
+                entry = self.store.get(key)
+                if entry is not None:
+                    found.append((key[-1], *entry))
+        for question, vec, answer, ts in sorted(found, key=lambda e: e[3])[-self.maxsize:]:
+            self._put(question, vec, answer, ts)
+
+    def _put(self, question: str, vec: np.ndarray, answer: str, ts: float):
+        if question in self._entries:
+            row = self._entries[question][0]
+        else:
+            if not self._free:
+                self._remove(next(iter(self._entries)))
+            row = self._free.pop()
+        if self._vecs is None:
+            self._vecs = np.zeros((self.maxsize, len(vec)), dtype=np.float32)
+        self._vecs[row] = vec
+        self._used[row] = True
+        self._questions[row] = question
+        self._entries[question] = (row, answer, ts)
+        self._entries.move_to_end(question)
+
+    def _remove(self, question: str):
+        row = self._entries.pop(question)[0]
+        self._used[row] = False
+        self._questions[row] = None
+        self._free.append(row)
+        if self.store is not None:
+            self.store.delete((*self.namespace, question))
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for question in [q for q, (_, _, ts) in self._entries.items() if ts < cutoff]:
+            self._remove(question)
+
+    @staticmethod
+    def clear(store: Cache, prefix: tuple):
+        """
+        Delete every persisted entry whose namespace starts with `prefix`.
+
+        Args:
+            store (Cache): The diskcache Cache the entries were written to.
+            prefix (tuple): Namespace prefix, e.g. ("semantic", user_id) for all
+                of one user's entries whatever model or prompt produced them.
+        """
+        prefix = tuple(prefix)
+        for key in list(store.iterkeys()):
+            if isinstance(key, tuple) and key[:len(prefix)] == prefix:
+                store.delete(key)
+
+    def lookup(self, vec: np.ndarray) -> Optional[str]:
+        """
+        Find the answer of the most similar cached question.
+
+        All cached embeddings are compared in one matrix-vector product; at the
+        cache sizes used here this exact scan is cheaper than an LSH index and
+        has no recall loss.
+
+        Args:
+            vec (np.ndarray): L2-normalized embedding of the new question.
+
+        Returns:
+            Optional[str]: The cached answer, or None on a miss.
+        """
+        self._expire()
+        if not self._entries:
+            return None
+        sims = self._vecs @ vec
+        sims[~self._used] = -np.inf
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        question = self._questions[best]
+        self._entries.move_to_end(question)
+        return self._entries[question][1]
+
+    def insert(self, question: str, vec: np.ndarray, answer: str):
+        """
+        Cache an answer, evicting the least recently used entry if full.
+
+        Args:
+            question (str): The question text.
+            vec (np.ndarray): Its L2-normalized embedding.
+            answer (str): The generated answer.
+        """
+        ts = time.time()
+        self._put(question, vec, answer, ts)
+        if self.store is not None:
+            self.store.set((*self.namespace, question), (np.asarray(vec, dtype=np.float32), answer, ts),
+                           expire=self.ttl)
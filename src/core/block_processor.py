@@ -12,7 +12,8 @@ class BlockProcessor:
         seen_header = False
         cleaned = []
         for b in blocks:
-            t = b.get("type","").lower()
+            # Types are already lowercase: extractors normalize them when building blocks.
+            t = b.get("type")
             if t == "page-footer":
                 continue  
             if t == "page-header":
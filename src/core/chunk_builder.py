@@ -1,42 +1,118 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
+from collections import deque
+import mmh3
+from datasketch import MinHash, MinHashLSH
 from semantic_text_splitter import TextSplitter
 from typing import List, Dict
 
 
-class ChunkBuilder:
+_HYPHEN = re.compile(r"-\n")
+_NL = re.compile(r"\n+")
+_WS = re.compile(r"\s+")
+
+
+def _shingle_hash(shingle: str) -> int:
+    # Stable 32-bit hash for MinHash (the built-in hash() is salted per process,
+    # which would make dedup, and so chunk ids, change from run to run).
+    return mmh3.hash(shingle, signed=False)
+
+
+def _single_chunk(text: str, chunk_size: int) -> Optional[list[str]]:
+    # A tiktoken token spans at least one UTF-8 byte, so a text of at most
+    # `chunk_size` bytes always fits in one chunk: skip tokenization for it.
+    if len(text) <= chunk_size and len(text.encode("utf-8")) <= chunk_size:
+        text = text.strip()
+        return [text] if text else []
+    return None
+
 
+class ChunkBuilder:
 
     def __init__(self, tokenizer_model: str, chunk_size:int=500, logger=None):
 
         self.logger = logger
+        self.tokenizer_model = tokenizer_model
+        self.chunk_size = chunk_size
+        # Built once: the tokenizer and its regexes are compiled here, not per call.
         self.splitter = TextSplitter.from_tiktoken_model(tokenizer_model,(chunk_size,chunk_size))
     
 
     @staticmethod
     def _clean_text(text:str)->str:
-        text = re.sub(r"-\n", "", text)
-        text = re.sub(r"\n+", "\n", text)
-        text = re.sub(r"\s+", " ", text)
-        return text.strip() 
+        return _WS.sub(" ", _NL.sub("\n", _HYPHEN.sub("", text))).strip()
     
-    def remove_near_duplicates(self, blocks:List[Dict], windows:int = 10)->List[Dict]:
+    def remove_near_duplicates(self, blocks:List[Dict], windows:int = 10, threshold:float = 0.85,
+                               min_words:int = 8, num_perm:int = 128)->List[Dict]:
+        """
+        Drop exact duplicates within a local window and near-duplicates across the whole input.
+
+        Exact repeats among the last `windows` kept blocks are caught first with
+        a set lookup. Longer blocks are then compared globally with MinHash LSH
+        over character 5-grams: LSH finds candidate matches among the already
+        kept blocks, and a block is dropped only if its estimated Jaccard
+        similarity to one of them reaches `threshold` (the first occurrence
+        wins). LSH keeps this near-linear in the number of blocks instead of
+        comparing every pair.
+
+        Blocks under `min_words` words (titles, captions) only get the local
+        exact check, so a heading legitimately repeated in another section is kept.
 
-        seen = []
+        Args:
+            blocks (List[Dict]): Blocks with a "text" field, in document order.
+            windows (int): Size of the exact-match window (default: 10).
+            threshold (float): Jaccard similarity above which blocks are
+                near-duplicates (default: 0.85).
+            min_words (int): Minimum words for the global MinHash check (default: 8).
+            num_perm (int): MinHash permutations (default: 128).
+
+        Returns:
+            List[Dict]: The kept blocks, in their original order.
+        """
+        # The deque holds the last `windows` kept texts; the set mirrors it
+        # for O(1) membership checks.
+        seen = deque(maxlen=windows)
+        seen_set = set()
+        lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+        # Generating the permutations is the costly part of MinHash(): do it once.
+        permutations = MinHash(num_perm=num_perm).permutations
+        kept_hashes = {}
         cleaned = []
-        for b in blocks:
-            txt = re.sub(r"\s+", " ", b["text"]).strip().lower()
-            if txt in seen[-windows:]:
+        for idx, b in enumerate(blocks):
+            txt = _WS.sub(" ", b["text"]).strip().lower()
+            if txt in seen_set:
                 if self.logger:
-                    self.logger.debug(f"Duplicate removed (local window): {txt[:50]}...")
+                    self.logger.opt(lazy=True).debug("Duplicate removed (local window): {}...", lambda: txt[:50])
                 continue
+            if txt.count(" ") + 1 >= min_words:
+                mh = MinHash(num_perm=num_perm, hashfunc=_shingle_hash, permutations=permutations)
+                mh.update_batch({txt[i:i + 5] for i in range(len(txt) - 4)})
+                if any(mh.jaccard(kept_hashes[c]) >= threshold for c in lsh.query(mh)):
+                    if self.logger:
+                        self.logger.opt(lazy=True).debug("Near-duplicate removed (MinHash): {}...", lambda: txt[:50])
+                    continue
+                lsh.insert(idx, mh)
+                kept_hashes[idx] = mh
             cleaned.append(b)
+            if len(seen) == windows:
+                seen_set.discard(seen[0])
             seen.append(txt)
+            seen_set.add(txt)
         return cleaned
 
     def merge_small_blocks(self, blocks: List[Dict], min_words:int=20) ->List[Dict]:
         merged, buffer = [], None
-        
+        # (text, label) keys of the entities already in `buffer`, kept in sync
+        # incrementally instead of being rebuilt on every merge.
+        buffer_ents = set()
+
+        def absorb(ents):
+            for e in ents:
+                key = (e["text"], e["label"])
+                if key not in buffer_ents:
+                    buffer_ents.add(key)
+                    buffer["entities"].append(e)
+
         for b in blocks:
             txt = b["text"].strip()
             page = b.get("page", 0)
@@ -48,25 +124,21 @@ class ChunkBuilder:
                 if buffer is None:
                     buffer = b.copy()
                     buffer["entities"] = ents.copy()
+                    buffer_ents = {(e["text"], e["label"]) for e in ents}
                 else:
                     if buffer.get("page", 0) == page:
                         buffer["text"]+= " "+txt
-                        existing = { (e["text"], e["label"]) for e in buffer["entities"] }
-                        for e in ents:
-                            if (e["text"], e["label"]) not in existing:
-                                buffer["entities"].append(e)
+                        absorb(ents)
                     else:
                         merged.append(buffer)
                         buffer = b.copy()
                         buffer["entities"] = ents.copy()
+                        buffer_ents = {(e["text"], e["label"]) for e in ents}
             else:
                 if buffer:
                     if buffer.get("page", 0)==page:
                         buffer["text"] += " "+txt
-                        existing = { (e["text"], e["label"]) for e in buffer["entities"] }
-                        for e in ents:
-                            if (e["text"], e["label"]) not in existing:
-                                buffer["entities"].append(e)
+                        absorb(ents)
                         merged.append(buffer)
                         buffer = None
                         
@@ -83,11 +155,39 @@ class ChunkBuilder:
         """
         Split text into semantic chunks using the configured TextSplitter.
 
+        Texts short enough to be a single chunk are returned as-is (stripped)
+        without running the tokenizer.
+
         Args:
             text (str): The text to split.
 
         Returns:
             list[str]: List of chunk strings.
         """
-        return self.splitter.chunks(text)
- 
\ No newline at end of file
+        parts = _single_chunk(text, self.chunk_size)
+        return self.splitter.chunks(text) if parts is None else parts
+
+    def split_many(self, texts: list[str]) -> list[list[str]]:
+        """
+        Split many texts into semantic chunks with a single call into the Rust splitter.
+
+        Texts that fit in one chunk take the `split_text` shortcut; all others
+        go to `TextSplitter.chunk_all`, which splits them in parallel on native
+        threads without the GIL, with no per-text Python round trip and none of
+        the start-up and pickling cost of a process pool.
+
+        Args:
+            texts (list[str]): The texts to split.
+
+        Returns:
+            list[list[str]]: One list of chunk strings per input text, in order.
+        """
+        out, long_idx = [], []
+        for i, text in enumerate(texts):
+            parts = _single_chunk(text, self.chunk_size)
+            if parts is None:
+                long_idx.append(i)
+            out.append(parts)
+        for i, parts in zip(long_idx, self.splitter.chunk_all([texts[i] for i in long_idx])):
+            out[i] = parts
+        return out
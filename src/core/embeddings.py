@@ -0,0 +1,101 @@
+import os
+from functools import lru_cache
+from typing import List, Optional
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+
+def default_device() -> str:
+    """
+    Return "cuda" when a GPU is available, else "cpu".
+    """
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def configure_torch_threads(config: dict):
+    """
+    Set torch's CPU thread pools for embedding inference.
+
+    Intra-op threads (used inside one encode call) default to all cores instead
+    of whatever the deployment inherited. Inter-op parallelism is set to 1,
+    because encode() runs one op after another and extra inter-op threads only
+    oversubscribe the CPU when the caller already uses its own thread pool.
+
+    Args:
+        config (dict): Configuration loaded from config.yaml. Reads the optional
+            `runtime.torch_threads` (default: os.cpu_count()).
+    """
+    threads = int(config.get("runtime", {}).get("torch_threads") or os.cpu_count() or 1)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work has started.
+        pass
+
+
+@lru_cache(maxsize=4)
+def get_embed_model(name: str, device: Optional[str] = None, backend: str = "torch",
+                    onnx_file: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load a SentenceTransformer once per (name, device, backend) and share it process-wide.
+
+    Every Indexer and Searcher (one per user) gets the same instance, so the
+    weights are read from disk and placed on the GPU only once however many
+    users are served. The model is only used for inference, so sharing it is safe.
+
+    Args:
+        name (str): Sentence Transformers model name.
+        device (str, optional): "cuda" or "cpu" (default: `default_device()`).
+            With the torch backend the model is cast to float16 on cuda. CPU
+            threads are set separately by `configure_torch_threads`.
+        backend (str): "torch" (default) or "onnx". The ONNX Runtime backend
+            runs a fused, optimized graph and is typically several times faster
+            on CPU; it needs `pip install "sentence-transformers[onnx]"`.
+        onnx_file (str, optional): ONNX file inside the model repository, e.g.
+            "onnx/model_qint8_avx512_vnni.onnx" for the int8-quantized export.
+            Defaults to "onnx/model.onnx", exported on the fly if missing.
+
+    Returns:
+        SentenceTransformer: The shared model.
+    """
+    device = device or default_device()
+    if backend != "torch":
+        model_kwargs = {"file_name": onnx_file} if onnx_file else None
+        return SentenceTransformer(name, device=device, backend=backend, model_kwargs=model_kwargs)
+    model = SentenceTransformer(name, device=device)
+    if device == "cuda":
+        # fp16 weights halve memory traffic; outputs are cast back to float32.
+        model.half()
+    return model
+
+
+def encode_texts(model: SentenceTransformer, texts: List[str], batch_size: int,
+                 show_progress_bar: bool = False) -> np.ndarray:
+    """
+    Encode texts into L2-normalized float32 embeddings, in input order.
+
+    `SentenceTransformer.encode` already does length-sorted ("smart") batching:
+    it sorts the inputs by length, encodes each mini-batch padded only to its
+    longest member, and restores the original order. Texts are therefore passed
+    through unsorted; sorting them here as well would only cost an extra pass.
+
+    Args:
+        model (SentenceTransformer): The embedding model.
+        texts (List[str]): Texts to encode.
+        batch_size (int): Number of texts per forward pass.
+        show_progress_bar (bool): Show a tqdm progress bar (default: False).
+
+    Returns:
+        np.ndarray: An (len(texts), dim) float32 array.
+    """
+    with torch.inference_mode():
+        embs = model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=show_progress_bar,
+        )
+    return embs.astype(np.float32, copy=False)
@@ -1,12 +1,32 @@
+from functools import lru_cache
 from pathlib import Path
+import copy
 import json
+import ijson
 import yaml
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback; slower, same output format
+    orjson = None
+
+
+def _json_dumps(data, indent:bool=False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def _json_loads(raw:bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 class FileManager:
     """
         A utility class to handle common file operations like:
         - loading YAML config files
         - saving and loading JSON data
+        - saving and streaming Parquet tables (needs `pyarrow`)
         - ensuring folders exist
 
         This centralizes all file-related logic for the pipeline.
@@ -47,6 +67,9 @@ class FileManager:
         """
         Load a YAML configuration file from the specified path.
 
+        The file is parsed only once per process; later calls for the same
+        path (e.g. from LayoutExtractor and EntityExtractor) reuse the result.
+
         Args:
             path (Path): Path to the YAML config file.
 
@@ -60,8 +83,8 @@ class FileManager:
 
         if not path.exists():
             raise FileNotFoundError(f'Config file not found at {path}')
-        with open(path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        # Parsed once per resolved path; callers get their own copy to mutate.
+        config = copy.deepcopy(self._parse_yaml(str(path.resolve())))
         if self.logger:
             self.logger.info(f"Loaded config from: {path}")
         return config
@@ -69,10 +92,24 @@ class FileManager:
 
 
 
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _parse_yaml(path:str) -> dict:
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+
+
+
+
     def save_json(self, data, path:Path):
         """
         Save a Python object as a JSON file (UTF-8 encoded + pretty printed).
 
+        Serialized with orjson when installed, whose C encoder writes bytes
+        directly and is several times faster than the stdlib `json` module on
+        large chunk lists; falls back to `json` otherwise. Non-string dict keys
+        (e.g. int page numbers) are written as strings in both cases.
+
         Args:
             data (Any): Any JSON-serializable Python object to save.
             path (Path): Path where the JSON file will be saved.
@@ -82,10 +119,43 @@ class FileManager:
         """
 
         self.ensure_dir(path.parent)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data,f,ensure_ascii=False, indent=2)
+        path.write_bytes(_json_dumps(data, indent=True))
+        if self.logger:
+            self.logger.info(f"Saved Json to: {path}")
+
+
+    def save_json_stream(self, items, path:Path) -> int:
+        """
+        Write an iterable of JSON-serializable objects as a JSON array, one item at a time.
+
+        Unlike `save_json`, neither the full list nor the full serialized string
+        is ever held in memory: each item is encoded and written as it is
+        produced, so a generator can be consumed directly. The output is a
+        regular JSON array (one item per line) readable by `load_json` and
+        `iter_json`.
+
+        Args:
+            items (Iterable[Any]): The objects to save, e.g. a generator of dicts.
+            path (Path): Path where the JSON file will be saved.
+
+        Returns:
+            int: The number of items written.
+
+        Note:
+            Creates the parent directory if it does not exist.
+        """
+        self.ensure_dir(path.parent)
+        count = 0
+        with open(path, "wb") as f:
+            f.write(b"[")
+            for item in items:
+                f.write(b",\n" if count else b"\n")
+                f.write(_json_dumps(item))
+                count += 1
+            f.write(b"\n]\n")
         if self.logger:
             self.logger.info(f"Saved Json to: {path}")
+        return count
     
 
 
@@ -106,8 +176,92 @@ class FileManager:
         """
         if not path.exists():
             raise FileNotFoundError(f'JSON file not found at {path}')
-        with open (path, 'r', encoding='utf-8') as f:
-            data=json.load(f)
+        data = _json_loads(path.read_bytes())
         if self.logger:
             self.logger.info(f'Loaded JSON from: {path}')
-        return data
\ No newline at end of file
+        return data
+
+
+
+    def iter_json(self, path:Path):
+        """
+        Stream the elements of a top-level JSON array one at a time.
+
+        Unlike `load_json`, the file is parsed incrementally, so peak memory is
+        bounded by a single element instead of the whole document.
+
+        Args:
+            path (Path): Path to a JSON file whose root is an array.
+
+        Yields:
+            Any: Each array element as a Python object.
+
+        Raises:
+            FileNotFoundError: If the JSON file does not exist.
+        """
+        if not path.exists():
+            raise FileNotFoundError(f'JSON file not found at {path}')
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+        if self.logger:
+            self.logger.info(f'Streamed JSON from: {path}')
+
+
+
+    def save_parquet(self, records, path:Path, dictionary_columns:list=()):
+        """
+        Save flat records as a zstd-compressed Parquet table (one column per key).
+
+        Columnar storage lets readers load only the columns they need instead
+        of parsing every record in full.
+
+        Args:
+            records (list[dict] | dict[str, list]): Records sharing the same
+                keys, or the table already in columnar form (one equal-length
+                list per column), which skips building a dict per row.
+            path (Path): Path where the Parquet file will be saved.
+            dictionary_columns (list[str]): String columns with few distinct values
+                (e.g. filename, user_id) to store as Arrow dictionary arrays, so
+                each distinct value is kept once and rows hold small integer codes.
+
+        Note:
+            Creates the parent directory if it does not exist.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.ensure_dir(path.parent)
+        table = pa.Table.from_pydict(records) if isinstance(records, dict) else pa.Table.from_pylist(records)
+        for name in dictionary_columns:
+            if name in table.column_names:
+                idx = table.schema.get_field_index(name)
+                table = table.set_column(idx, name, table[name].dictionary_encode())
+        pq.write_table(table, path, compression="zstd")
+        if self.logger:
+            self.logger.info(f"Saved Parquet to: {path}")
+
+
+
+    def iter_parquet(self, path:Path, batch_size:int=1024, columns:list=None):
+        """
+        Stream a Parquet file as lists of dicts, reading only the requested columns.
+
+        Args:
+            path (Path): Path to the Parquet file.
+            batch_size (int): Maximum number of rows per yielded list (default: 1024).
+            columns (list[str], optional): Columns to read. Defaults to all columns.
+
+        Yields:
+            list[dict]: Consecutive batches of rows.
+
+        Raises:
+            FileNotFoundError: If the Parquet file does not exist.
+        """
+        import pyarrow.parquet as pq
+
+        if not path.exists():
+            raise FileNotFoundError(f'Parquet file not found at {path}')
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pylist()
+        if self.logger:
+            self.logger.info(f'Streamed Parquet from: {path}')
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from chromadb import PersistentClient
+from loguru import logger
+
+
+@lru_cache(maxsize=None)
+def get_client(path: str):
+    """
+    Open a ChromaDB PersistentClient once per database directory.
+
+    Indexers and Searchers for every user share the returned client, so the
+    SQLite store and HNSW segment cache are opened only once per process.
+
+    Args:
+        path (str): The ChromaDB database directory.
+
+    Returns:
+        ClientAPI: The shared client.
+    """
+    return PersistentClient(path=path)
+
+
+def get_collection(client, config: dict):
+    """
+    Get (or create) the shared ChromaDB collection with the configured HNSW metric.
+
+    Indexer and Searcher both go through this helper so the write side and the
+    query side always agree on the collection name and distance function.
+
+    Args:
+        client (ClientAPI): An open ChromaDB client.
+        config (dict): Configuration loaded from config.yaml. Reads the optional
+            `vector_store` section:
+                - collection: collection name (default: "documents")
+                - space: HNSW distance, "cosine" | "ip" | "l2" (default: "ip").
+                  Embeddings are L2-normalized on both the index and the query
+                  side, so "ip" ranks exactly like "cosine" without re-deriving
+                  norms at each distance computation.
+                - hnsw: optional HNSW parameters passed through as `hnsw:<key>`
+                  metadata, e.g. M, construction_ef, search_ef, batch_size,
+                  sync_threshold
+
+    Returns:
+        Collection: The ChromaDB collection.
+
+    Note:
+        The metric and graph parameters are fixed when the collection is first
+        created. Changing them afterwards requires deleting the vector_db
+        directory and re-running the index stage; a warning is logged when an
+        existing collection uses another metric than the configured one (e.g.
+        ChromaDB's default "l2" for collections created before it was set).
+    """
+    store_cfg = config.get("vector_store", {})
+    space = store_cfg.get("space", "ip")
+    metadata = {"hnsw:space": space}
+    metadata.update({f"hnsw:{k}": v for k, v in store_cfg.get("hnsw", {}).items()})
+    collection = client.get_or_create_collection(
+        store_cfg.get("collection", "documents"),
+        metadata=metadata,
+    )
+    actual = (collection.metadata or {}).get("hnsw:space", "l2")
+    if actual != space:
+        logger.warning(
+            f"Collection '{collection.name}' uses hnsw:space={actual!r}, not the configured "
+            f"{space!r}; delete the vector_db directory and re-index to apply it."
+        )
+    return collection
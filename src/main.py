@@ -1,18 +1,11 @@
 from pathlib import Path
 import sys
 
-from src.pipeline.answerer import Answerer
-from src.pipeline.searcher import Searcher
-from src.pipeline.indexer import Indexer
-from src.pipeline.ingestor import Ingestor
-
 from src.core.Logger import LoggerManager
 from src.core.utils import FileManager
-from src.core.block_processor import BlockProcessor
-from src.modules.layout_extractor import LayoutExtractor
-from src.modules.document_loader import DocumentLoader
-from src.modules.entity_extractor import EntityExtractor
-from src.core.chunk_builder import ChunkBuilder
+
+# Pipeline stages are imported inside their branch below: each pulls in heavy
+# libraries (torch, YOLO, spaCy, ChromaDB...) that the other stages don't need.
 
 if __name__ == "__main__":
     log_manager = LoggerManager(Path("storage/logs"))
@@ -33,6 +26,13 @@ if __name__ == "__main__":
 
 
     if stage == "ingest":
+        from src.pipeline.ingestor import Ingestor
+        from src.core.block_processor import BlockProcessor
+        from src.modules.layout_extractor import LayoutExtractor
+        from src.modules.document_loader import DocumentLoader
+        from src.modules.entity_extractor import EntityExtractor
+        from src.core.chunk_builder import ChunkBuilder
+
         # --- بناء الـ dependencies الجديدة ---
         blockproc = BlockProcessor(logger)
         layout = LayoutExtractor(files, Path("config/config.yaml"))
@@ -58,14 +58,17 @@ if __name__ == "__main__":
         ingestor.run()
 
     elif stage == "index":
+        from src.pipeline.indexer import Indexer
         indexer = Indexer(config, files, logger, user_id)
         indexer.run()
 
     elif stage == "search":
+        from src.pipeline.searcher import Searcher
         query = " ".join(extra) or "What is HCL?"
         Searcher(config, files, logger, user_id).run(query)
     
     elif stage == "answer":
+        from src.pipeline.answerer import Answerer
         question = " ".join(extra) or "What is HCL?"
         Answerer(config, files, logger, user_id).run(question)
         
@@ -1,8 +1,18 @@
 
+import asyncio
+import hashlib
+from pathlib import Path
 from typing import List, Dict
+from diskcache import Cache
 from src.pipeline.searcher import Searcher
 from src.core.utils import FileManager
+from src.core.answer_cache import SemanticCache
 import ollama   
+from ollama import AsyncClient
+
+
+# Kept byte-identical across requests so Ollama can reuse its KV cache for it.
+SYSTEM_PROMPT = "You are a helpful AI assistant. Answer the question based only on the provided context."
 
 class Answerer:
     """
@@ -30,6 +40,13 @@ class Answerer:
         Args:
             config (dict): Configuration loaded from config.yaml. Must include:
                 - models.llm_model: name of the local Ollama model to use.
+                - paths.answer_cache (optional): directory of the persistent
+                  exact-match and semantic answer caches (default: storage/answer_cache).
+                - models.ollama_parallel (optional): max concurrent requests
+                  issued by `run_batch` (default: 4).
+                - answer_cache (optional): semantic answer cache settings
+                  `similarity_threshold` (default: 0.95), `maxsize` (default: 1024)
+                  and `ttl` in seconds (default: 3600).
             file_manager (FileManager): Utility class for reading/writing files.
             logger (Logger): Loguru logger instance to log progress and errors.
             user_id (str): The unique identifier of the current user. Used to
@@ -40,6 +57,21 @@ class Answerer:
         self.user_id = user_id
         self.searcher = Searcher(config, file_manager, logger, user_id)
         self.model = config['models']["llm_model"]
+        self.parallel = int(config['models'].get("ollama_parallel", 4))
+        cache_cfg = config.get("answer_cache", {})
+        self.exact_cache = Cache(str(Path(config['paths'].get("answer_cache", "storage/answer_cache"))))
+        # Persisted next to the exact-match answers, so one-shot CLI runs hit it too.
+        # Namespaced per user (answers are built from that user's private chunks),
+        # then per model and system prompt so changing either never serves an old
+        # answer. The Indexer clears the user's entries after re-indexing.
+        self.semantic_cache = SemanticCache(
+            threshold=float(cache_cfg.get("similarity_threshold", 0.95)),
+            maxsize=int(cache_cfg.get("maxsize", 1024)),
+            ttl=float(cache_cfg.get("ttl", 3600)),
+            store=self.exact_cache,
+            namespace=("semantic", user_id, self.model,
+                       hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()),
+        )
         self.logger.info(f"Answer initialized for user {user_id} with Ollama model: {self.model}")
 
 
@@ -50,6 +82,9 @@ class Answerer:
 
         This text will be provided as context for the LLM to ground its answer.
 
+        Chunks are ordered by id, so the same retrieved set always produces the
+        same prompt prefix and can hit the LLM server's prefix cache.
+
         Args:
             chunks (List[Dict]): List of chunks returned by the Searcher.
 
@@ -57,7 +92,29 @@ class Answerer:
             str: A single text string containing all chunk texts separated by newlines.
         """
 
-        return "\n\n".join([c["text"] for c in chunks])
+        return "\n\n".join(c["text"] for c in sorted(chunks, key=lambda c: c["id"]))
+
+
+    def _exact_key(self, question:str, context:str)->str:
+        """
+        Build the exact-match cache key of a question and its context.
+
+        The key covers the LLM model, the system prompt, the question and the
+        built context text, so swapping the Ollama model, editing the prompt or
+        retrieving different or edited chunks never serves a stale answer.
+
+        Args:
+            question (str): The user's question.
+            context (str): The context built by `build_context`.
+
+        Returns:
+            str: A sha256 hex digest.
+        """
+        h = hashlib.sha256()
+        for part in (self.model, SYSTEM_PROMPT, question, context):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
     
 
     
@@ -77,12 +134,81 @@ class Answerer:
         Returns:
             str: The generated answer text from the model.
         """
-        prompt = f"Answer the question based only on the following context:\n {context}\n\nQuestion: {question}"
-        response = ollama.chat(model=self.model, messages=[
-            {"role": "system", "content": "You are a helpful AI assistant."},
-            {"role": "user", "content": prompt}
-        ])
+        response = ollama.chat(model=self.model, messages=self._messages(question, context))
         return response['message']['content']
+
+
+    async def generate_answer_async(self, client:AsyncClient, question:str, context:str)->str:
+        """
+        Asynchronous variant of `generate_answer` using an Ollama AsyncClient.
+
+        Args:
+            client (AsyncClient): Shared async Ollama client.
+            question (str): The user's question.
+            context (str): The combined text context from relevant chunks.
+
+        Returns:
+            str: The generated answer text from the model.
+        """
+        response = await client.chat(model=self.model, messages=self._messages(question, context))
+        return response['message']['content']
+
+
+    def _messages(self, question:str, context:str)->List[Dict]:
+        # Stable parts first, the question last: the longest shared prefix is
+        # what the server's prompt cache can reuse between requests.
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Context:\n{context}"},
+            {"role": "user", "content": f"Question: {question}"},
+        ]
+
+
+    async def run_batch(self, questions:List[str])->List[str]:
+        """
+        Answer many questions concurrently (e.g. for evaluation runs).
+
+        All questions are embedded in one batch. Those that hit the semantic
+        answer cache are answered directly; the rest are retrieved with one
+        `search_batch` call and checked against the exact-match cache. Then up
+        to `models.ollama_parallel` LLM requests are kept in flight at once. The
+        Ollama server only processes them in parallel if started with
+        `OLLAMA_NUM_PARALLEL` >= that value.
+
+        Args:
+            questions (List[str]): The questions to answer.
+
+        Returns:
+            List[str]: One answer per question, in the same order.
+
+        Example:
+            >>> answers = asyncio.run(answerer.run_batch(["What is HCL?", "Who wrote it?"]))
+        """
+        q_embs = self.searcher.embed_queries(questions)
+        answers = [self.semantic_cache.lookup(e) for e in q_embs]
+        misses = [i for i, a in enumerate(answers) if a is None]
+        retrieved = self.searcher.search_batch([questions[i] for i in misses], top_k=3, q_embs=q_embs[misses])
+        contexts, keys = {}, {}
+        for i, results in zip(list(misses), retrieved):
+            contexts[i] = self.build_context(results)
+            keys[i] = self._exact_key(questions[i], contexts[i])
+            answers[i] = self.exact_cache.get(keys[i])
+            if answers[i] is not None:
+                self.semantic_cache.insert(questions[i], q_embs[i], answers[i])
+                misses.remove(i)
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(self.parallel)
+
+        async def answer(i:int)->None:
+            async with semaphore:
+                answers[i] = await self.generate_answer_async(client, questions[i], contexts[i])
+            self.exact_cache.set(keys[i], answers[i])
+            self.semantic_cache.insert(questions[i], q_embs[i], answers[i])
+
+        self.logger.info(f"Answering {len(questions)} questions for user {self.user_id} "
+                         f"({len(questions) - len(misses)} cached, {self.parallel} in parallel)")
+        await asyncio.gather(*(answer(i) for i in misses))
+        return answers
     
 
     def run(self, question:str):
@@ -90,9 +216,11 @@ class Answerer:
         Execute the full answer generation pipeline for this user.
 
         Steps:
+          0) Return the cached answer if a near-identical question was answered recently
           1) Use Searcher to get the most relevant chunks for the question (only from this user)
           2) Build a text context from those chunks
-          3) Generate a natural-language answer using the Ollama model
+          3) Generate a natural-language answer using the Ollama model, unless the
+             same question was already answered from the same context with the same model
 
         Args:
             question (str): The user’s question text.
@@ -102,11 +230,23 @@ class Answerer:
         """
 
         self.logger.info(f" Generating answerfor user {self.user_id} for: {question}")
-        results = self.searcher.search(question, top_k=3)
-        context = self.build_context(results)
-        answer = self.generate_answer(question, context)
+        q_emb = self.searcher.embed_query(question)
+        answer = self.semantic_cache.lookup(q_emb)
         print("\n Question:", question)
-        print("\n Context:\n", context[:300], "...")
+        if answer is None:
+            results = self.searcher.search(question, top_k=3, q_emb=q_emb)
+            context = self.build_context(results)
+            key = self._exact_key(question, context)
+            answer = self.exact_cache.get(key)
+            if answer is None:
+                answer = self.generate_answer(question, context)
+                self.exact_cache.set(key, answer)
+            else:
+                self.logger.info(f"Exact answer cache hit for user {self.user_id}: {question}")
+            self.semantic_cache.insert(question, q_emb, answer)
+            print("\n Context:\n", context[:300], "...")
+        else:
+            self.logger.info(f"Semantic cache hit for user {self.user_id}: {question}")
         print("\n Answer:\n", answer)
         self.logger.info(" Answer generated for user {self.user_id}.") 
 
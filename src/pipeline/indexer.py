@@ -1,8 +1,13 @@
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-from chromadb import PersistentClient
+from typing import Dict, Iterator, List
+import numpy as np
+from diskcache import Cache
 from src.core.utils import FileManager
+from src.core.answer_cache import SemanticCache
+from src.core.embedding_cache import EmbeddingCache
+from src.core.embeddings import configure_torch_threads, encode_texts, get_embed_model
+from src.core.vector_store import get_client, get_collection
 
 class Indexer:
     """
@@ -18,6 +23,9 @@ class Indexer:
     per user without mixing data between users.
     """
 
+    # Number of chunks streamed from disk, encoded and stored per iteration.
+    STREAM_WINDOW = 1024
+
     def __init__(self, config:dict, file_manager:FileManager, logger, user_id:str):
         
         """
@@ -27,12 +35,23 @@ class Indexer:
           - The source chunks file path (storage/chunks_<user_id>.json)
           - The persistent ChromaDB client and target collection
           - The embedding model specified in config
+          - The persistent embedding cache (paths.embedding_cache, one per model)
 
         Args:
             config (dict): Configuration loaded from config.yaml. Must contain:
-                - paths.chunks_file: base path to the chunks JSON file
+                - paths.chunks_file: base path to the chunks file (.json or .parquet)
                 - paths.vector_db: directory path for the ChromaDB store
+                - paths.answer_cache (optional): answer cache directory whose
+                  semantic entries for this user are cleared after indexing
+                  (default: storage/answer_cache)
                 - models.embedding_model: Sentence Transformers model name
+                - models.embed_batch_size (optional): encode() batch size (default: 64)
+                - models.backend (optional): "torch" or "onnx" (default: "torch"),
+                  see `embeddings.get_embed_model`
+                - models.embed_device (optional): "cuda" or "cpu" (default: cuda
+                  when available). On cuda the model runs in float16; for
+                  all-MiniLM-L6-v2 that is ~45 MB of weights plus activations
+                  for one batch, well under 1 GB of VRAM at batch size 64.
             file_manager (FileManager): Utility for reading/writing local files.
             logger (Logger): Loguru logger for progress and error reporting.
             user_id (str): Unique identifier for the current user. Used to resolve
@@ -43,12 +62,30 @@ class Indexer:
         self.user_id = user_id
 
         path=config['paths']
-        self.chunks_file = Path(path['chunks_file']).with_name(f'chunks_{user_id}.json')
+        chunks_path = Path(path['chunks_file'])
+        self.chunks_file = chunks_path.with_name(f'chunks_{user_id}{chunks_path.suffix}')
         self.vector_db_dir = Path(path['vector_db'])
+        self.answer_cache_dir = Path(path.get('answer_cache', 'storage/answer_cache'))
 
-        self.embed_model=SentenceTransformer(config["models"]['embedding_model'])
-        self.client= PersistentClient(path=str(self.vector_db_dir))
-        self.collection = self.client.get_or_create_collection('documents')
+        # Shared across Indexer instances: loaded once per process.
+        models = config["models"]
+        configure_torch_threads(config)
+        self.embed_model = get_embed_model(
+            models['embedding_model'],
+            models.get("embed_device"),
+            models.get("backend", "torch"),
+            models.get("onnx_file"),
+        )
+        self.embed_batch_size = int(config["models"].get("embed_batch_size", 64))
+        self.client = get_client(str(self.vector_db_dir))
+        self.collection = get_collection(self.client, config)
+        # Largest batch ChromaDB accepts in one `add()` call (one transaction each).
+        self.max_add_batch = self.client.get_max_batch_size()
+        # A quantized ONNX export yields slightly different vectors: cache it apart.
+        cache_name = models['embedding_model']
+        if models.get("onnx_file"):
+            cache_name += f"__{Path(models['onnx_file']).stem}"
+        self.cache = EmbeddingCache(Path(path.get('embedding_cache', 'storage/emb_cache')), cache_name)
 
         self.logger.info('Indexer initialized for user {user_id}')
     
@@ -70,20 +107,102 @@ class Indexer:
         if not self.chunks_file.exists():
             self.logger.warning(f"No chunks file found for user {self.user_id}")
             return[]
-        chunks = self.files.load_json(self.chunks_file)
+        if self.chunks_file.suffix == ".parquet":
+            chunks = [row for batch in self.files.iter_parquet(self.chunks_file) for row in batch]
+        else:
+            chunks = self.files.load_json(self.chunks_file)
         self.logger.info(f"Loaded {len(chunks)} chunks from {self.chunks_file} for user {self.user_id}")
         return chunks 
 
 
+    def iter_chunks(self) -> Iterator[List[Dict]]:
+        """
+        Stream this user's chunks from the chunks file in windows of `STREAM_WINDOW` chunks.
+
+        The file (JSON or Parquet) is read incrementally, so only one window is held in
+        memory at a time regardless of the corpus size.
+
+        Yields:
+            List[Dict]: Consecutive lists of at most `STREAM_WINDOW` chunk dicts.
+                Nothing is yielded if the user-specific chunks file does not exist.
+        """
+        if not self.chunks_file.exists():
+            self.logger.warning(f"No chunks file found for user {self.user_id}")
+            return
+        if self.chunks_file.suffix == ".parquet":
+            # Columnar read: only the fields indexing needs are decoded.
+            yield from self.files.iter_parquet(
+                self.chunks_file, self.STREAM_WINDOW, columns=["filename", "chunk_id", "text"]
+            )
+            return
+        items = self.files.iter_json(self.chunks_file)
+        while window := list(islice(items, self.STREAM_WINDOW)):
+            yield window
+
+
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, running the model only on texts missing from the embedding cache.
+
+        Cache keys are BLAKE2b digests of the text, so any chunk whose text was
+        embedded before (in this or an earlier run) is read from the memory-mapped
+        cache file. Newly computed embeddings are written back to the cache.
+        Texts repeated within the call (boilerplate headers, disclaimers) are
+        looked up and encoded once, then scattered back to every position.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            np.ndarray: An (len(texts), dim) float32 array of L2-normalized embeddings.
+        """
+        slot, keys, uniq_texts = {}, [], []
+        inverse = np.empty(len(texts), dtype=np.intp)
+        for i, text in enumerate(texts):
+            k = EmbeddingCache.key(text)
+            j = slot.get(k)
+            if j is None:
+                j = slot[k] = len(keys)
+                keys.append(k)
+                uniq_texts.append(text)
+            inverse[i] = j
+
+        cached = self.cache.get_many(keys)
+        hit = [i for i, k in enumerate(keys) if k in cached]
+        miss = [i for i, k in enumerate(keys) if k not in cached]
+
+        dim = self.embed_model.get_sentence_embedding_dimension()
+        embs = np.empty((len(keys), dim), dtype=np.float32)
+        if hit:
+            embs[hit] = np.stack([cached[keys[i]] for i in hit])
+        if miss:
+            fresh = encode_texts(
+                self.embed_model,
+                [uniq_texts[i] for i in miss],
+                self.embed_batch_size,
+                show_progress_bar=True,
+            )
+            embs[miss] = fresh
+            self.cache.put_many([keys[i] for i in miss], fresh)
+
+        self.logger.info(
+            f"Embedding cache: {len(hit)} hits, {len(miss)} encoded, "
+            f"{len(texts) - len(keys)} duplicates skipped"
+        )
+        return embs[inverse]
+
 
     def index_chunks(self, chunks:List[Dict]):
         """
         Generate embeddings for the provided chunks and store them in ChromaDB.
 
-        For each chunk:
-          - Compute a dense vector embedding via SentenceTransformer
-          - Add the document text, embedding vector, and metadata to the collection
-          - Use an ID that includes user_id + filename + chunk_id to guarantee uniqueness
+        Chunk texts not found in the embedding cache are encoded in a single
+        batched call (SentenceTransformers sorts them by length internally, so
+        each mini-batch is only padded to its longest member), then documents, embeddings and metadata are written to
+        the collection in as few `add()` calls as ChromaDB's max batch size allows
+        (a single call for a typical window) rather than one `add()` per chunk.
+        Each ID includes user_id + filename + chunk_id to guarantee uniqueness.
 
         Args:
             chunks (List[Dict]): Chunks to index. Each must contain "text",
@@ -91,23 +210,30 @@ class Indexer:
                 into the stored metadata to enforce multi-user isolation.
 
         Notes:
-            For very large datasets, consider batching adds to reduce overhead.
-            ChromaDB `add()` accepts lists, so you can accumulate N items then add.
+            Embeddings are L2-normalized, so the query side must normalize too.
+            They stay in one contiguous (N, dim) float32 array; ChromaDB accepts
+            ndarray slices directly, so no per-vector Python lists are built.
         """
 
+        texts = [ch["text"] for ch in chunks]
+        embs = self.embed_texts(texts)
+
+        # One pass builds both ids and metadata, with the user fields hoisted.
+        user_id = self.user_id
+        prefix = f"{user_id}_"
+        ids, metas = [], []
         for ch in chunks:
-            emb = self.embed_model.encode(ch['text']).tolist()
+            filename, chunk_id = ch["filename"], ch["chunk_id"]
+            ids.append(f"{prefix}{filename}_{chunk_id}")
+            metas.append({"user_id": user_id, "filename": filename, "chunk_id": chunk_id})
+
+        step = self.max_add_batch
+        for i in range(0, len(chunks), step):
             self.collection.add(
-                ids=[f"{self.user_id}_{ch['filename']}_{ch['chunk_id']}"],
-                documents=[ch["text"]],
-                metadatas=[
-                    {
-                     "user_id": self.user_id,
-                    "filename": ch["filename"], 
-                     "chunk_id": ch["chunk_id"]
-                     }
-                    ],
-                embeddings=[emb],
+                ids=ids[i:i + step],
+                documents=texts[i:i + step],
+                metadatas=metas[i:i + step],
+                embeddings=embs[i:i + step],
             )
         self.logger.info(f'Stored {len(chunks)} chunks for user {self.user_id} into ChromaDB at {self.vector_db_dir}')
 
@@ -117,15 +243,20 @@ class Indexer:
         Execute the full indexing workflow for this user.
 
         Steps:
-          1) Load user-specific chunks from JSON (produced by ingestion)
-          2) Generate embeddings and write them into the ChromaDB collection
+          1) Stream user-specific chunks from JSON (produced by ingestion) in windows
+          2) Generate embeddings for each window and write them into the ChromaDB collection
+          3) Drop this user's cached semantic answers, which may quote edited chunks
 
         Side effects:
           Writes data into the persistent ChromaDB store and logs progress.
         """
         
         self.logger.info('Starting indexing for user {self.user_id} ...')
-        chunks = self.load_chunks()
-        if chunks:
-            self.index_chunks(chunks)
-        self.logger.info("Indexing finished for user {self.user_id}")
\ No newline at end of file
+        total = 0
+        for window in self.iter_chunks():
+            self.index_chunks(window)
+            total += len(window)
+        # Exact-match answers are keyed on the context text and stay valid.
+        with Cache(str(self.answer_cache_dir)) as answers:
+            SemanticCache.clear(answers, ("semantic", self.user_id))
+        self.logger.info(f"Indexing finished for user {self.user_id}: {total} chunks")
\ No newline at end of file
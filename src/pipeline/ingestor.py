@@ -1,6 +1,11 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict
-from semantic_text_splitter import TextSplitter
+from typing import List, Dict, Iterator, Optional, Tuple
 
 from src.core.utils import FileManager
 from src.modules.layout_extractor import LayoutExtractor
@@ -8,17 +13,42 @@ from src.modules.document_loader import DocumentLoader
 from src.core.block_processor import BlockProcessor
 from src.core.chunk_builder import ChunkBuilder
 from src.modules.entity_extractor import EntityExtractor
+
+
+def _read_one(loader: DocumentLoader, fp: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read one document in a worker process.
+
+    Errors are returned instead of logged: the parent's log sinks are not
+    usable from a forked worker.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (text, None) on success,
+            (None, error message) on failure.
+    """
+    try:
+        return loader.load(fp), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
 class Ingestor:
     """
     Ingestor
     --------
     Loads documents for a user, extracts layout blocks, removes repeated headers/footers,
-    splits them into semantic chunks, and saves the chunks as JSON.
+    splits them into semantic chunks, and saves the chunks as JSON (or Parquet when
+    `paths.chunks_file` ends in ".parquet").
 
     - If mode = "layout": uses LayoutExtractor to get structured blocks
       (with page-header/footer types) then cleans them with BlockProcessor.
     - If mode = "raw": uses DocumentLoader to just get raw text.
 
+    Cleaned, entity-annotated blocks are cached per document under
+    `paths.blocks_cache`, keyed by the sha256 of the file bytes and the
+    extraction settings, so re-ingesting unchanged files skips layout
+    extraction and NER entirely.
+
     This keeps user data separated via user_id.
     """
 
@@ -47,7 +77,28 @@ class Ingestor:
 
         paths = config["paths"]
         self.data_dir = Path(paths["data_dir"]) / user_id
-        self.chunks_file = Path(paths["chunks_file"]).with_name(f"chunks_{user_id}.json")
+        # The configured file suffix selects the format: ".json" (default) or ".parquet".
+        chunks_path = Path(paths["chunks_file"])
+        self.chunks_file = chunks_path.with_name(f"chunks_{user_id}{chunks_path.suffix}")
+        self.blocks_cache_dir = Path(paths.get("blocks_cache", "storage/cache"))
+        # Blocks depend on the settings that change extraction output too, not only
+        # on the file bytes. Throughput knobs such as layout.workers are left out.
+        layout_cfg = config.get("layout", {})
+        weights = getattr(layout_extractor, "weights_path", None)
+        weights_stat = weights.stat() if weights is not None and weights.exists() else None
+        self._cache_salt = json.dumps(
+            {
+                "mode": mode,
+                "pdf_dpi": layout_cfg.get("pdf_dpi"),
+                "imgsz": layout_cfg.get("imgsz"),
+                "score_thresh": layout_cfg.get("score_thresh"),
+                "use_ai": layout_cfg.get("use_ai"),
+                "ner_model": config.get("ner", {}).get("model"),
+                # Size and mtime stand in for a hash of the YOLO weights file.
+                "weights": [weights_stat.st_size, weights_stat.st_mtime_ns] if weights_stat else None,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
 
 
 
@@ -57,43 +108,107 @@ class Ingestor:
         if not self.data_dir.exists():
             self.logger.warning(f"No data folder for user {self.user_id}")
             return []
-        return [fp for fp in self.data_dir.glob("*") if fp.is_file()]
+        # DirEntry.is_file() uses the d_type from the directory listing, no stat() per entry.
+        with os.scandir(self.data_dir) as it:
+            return sorted(Path(e.path) for e in it if e.is_file())
 
-    def process_blocks(self, docs: List[Path]) -> List[Dict]:
-        blocks = []
+    def _cache_key(self, fp: Path) -> str:
+        """
+        Content hash of a document plus the extraction settings.
+
+        Args:
+            fp (Path): Path to the document.
+
+        Returns:
+            str: A sha256 hex digest.
+        """
+        h = hashlib.sha256(self._cache_salt)
+        with open(fp, "rb") as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _extract(self, docs: List[Path]) -> Dict[Path, List[Dict]]:
+        """
+        Extract raw blocks from documents (no cleaning, no entities).
+
+        Args:
+            docs (List[Path]): Documents to extract.
 
+        Returns:
+            Dict[Path, List[Dict]]: Blocks per document; documents that failed
+                to read (raw mode) are left out.
+        """
         if self.mode == "layout":
-            for doc in docs:
-                self.logger.info(f"Extracting layout from {doc.name}")
-                b = self.layout.extract(doc)
-                for blk in b:
-                    blk["filename"] = doc.name
-                    blk["user_id"] = self.user_id
-                blocks.extend(b)
-        else:
-            # raw text: create 1 block per doc
-            for doc in docs:
-                text = self.loader.load(doc)
-                blocks.append({
-                    "filename": doc.name,
-                    "text": text,
-                    "type": "text",
-                    "page": 0,
-                    "user_id": self.user_id
-                })
-
-        # Clean headers/footers
-        blocks = self.proc.remove_page_headers_footers(blocks)
-
-        # Add entities
-        blocks = self.entities.add_entities(blocks)
+            self.logger.info(f"Extracting layout from {len(docs)} documents")
+            return dict(zip(docs, self.layout.extract_many(docs)))
+
+        # raw text: create 1 block per doc; PDF/DOCX parsing is CPU-bound,
+        # so documents are read in parallel worker processes. Spawned, not forked,
+        # like LayoutExtractor.extract_many: the parent may already hold CUDA state
+        # and the log writer thread.
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(os.cpu_count() or 1, len(docs))),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as ex:
+            results = list(ex.map(partial(_read_one, self.loader), docs, chunksize=4))
+        extracted = {}
+        for doc, (text, error) in zip(docs, results):
+            if error:
+                self.logger.error(f"Failed to read {doc.name}: {error}")
+                continue
+            extracted[doc] = [{"text": text, "type": "text", "page": 0}]
+        return extracted
+
+    def process_blocks(self, docs: List[Path]) -> List[Dict]:
+        keys = {doc: self._cache_key(doc) for doc in docs}
+        per_doc, todo = {}, []
+        for doc in docs:
+            cached = self.blocks_cache_dir / f"{keys[doc]}.blocks.json"
+            if cached.exists():
+                per_doc[doc] = self.files.load_json(cached)
+            else:
+                todo.append(doc)
+        self.logger.info(f"Block cache: {len(per_doc)} documents cached, {len(todo)} to process")
 
+        if todo:
+            extracted = self._extract(todo)
+            fresh = []
+            for doc, b in extracted.items():
+                # Clean headers/footers (keeps each document's first header)
+                per_doc[doc] = self.proc.remove_page_headers_footers(b)
+                fresh.extend(per_doc[doc])
+                self.logger.info(f"Extracted {len(per_doc[doc])} blocks from {doc.name}")
+
+            # Add entities, in one call for all new documents so NER can batch
+            self.entities.add_entities(fresh)
+
+            for doc in extracted:
+                self.files.save_json(per_doc[doc], self.blocks_cache_dir / f"{keys[doc]}.blocks.json")
+
+        blocks = []
+        for doc in docs:
+            if doc not in per_doc:
+                continue
+            meta = {"filename": doc.name, "user_id": self.user_id}
+            for blk in per_doc[doc]:
+                blk.update(meta)
+            blocks.extend(per_doc[doc])
         return blocks
 
-    def build_chunks(self, blocks: List[Dict]) -> List[Dict]:
+    def build_chunks(self, blocks: List[Dict]) -> Dict[str, list]:
         """
         Build semantic chunks from blocks after cleaning and entity annotation.
         Also removes near-duplicate chunks and merges small ones on same page.
+
+        Chunks are returned in columnar form (one list per field, all the same
+        length) rather than as one dict per chunk: per-block fields are repeated
+        with a single `list.extend` per block, and row dicts are only created
+        while saving (see `iter_chunks`), or never for Parquet output.
+
+        Returns:
+            Dict[str, list]: Columns "filename", "chunk_id", "text", "type",
+                "page" and "entities".
         """
         # Step 1: remove near duplicates (within ±10 window)
         blocks = self.chunker.remove_near_duplicates(blocks, windows=10)
@@ -102,29 +217,65 @@ class Ingestor:
         blocks = self.chunker.merge_small_blocks(blocks, min_words=20)
 
         # Step 3: build final chunks with incremental IDs
-        chunks = []
-        cid = 0
-        for b in blocks:
-            for part in self.chunker.split_text(b["text"]):
-                chunks.append({
-                    "filename": b["filename"],
-                    "chunk_id": cid,
-                    "text": part,
-                    "type": b.get("type", "text"),
-                    "page": b.get("page", 0),
-                    "entities": b.get("entities", []),
-                    "user_id": self.user_id,
-                })
-                cid += 1
-        return chunks
+        filenames, texts, types, pages, entities = [], [], [], [], []
+        parts_per_block = self.chunker.split_many([b["text"] for b in blocks])
+        for b, parts in zip(blocks, parts_per_block):
+            n = len(parts)
+            if not n:
+                continue
+            texts.extend(parts)
+            filenames.extend([b["filename"]] * n)
+            types.extend([b.get("type", "text")] * n)
+            pages.extend([b.get("page", 0)] * n)
+            entities.extend([b.get("entities", [])] * n)
+        return {
+            "filename": filenames,
+            "chunk_id": list(range(len(texts))),
+            "text": texts,
+            "type": types,
+            "page": pages,
+            "entities": entities,
+        }
+
+    def iter_chunks(self, columns: Dict[str, list]) -> Iterator[Dict]:
+        """
+        Turn the columns from `build_chunks` into chunk dicts, one at a time.
+
+        Args:
+            columns (Dict[str, list]): The output of `build_chunks`.
+
+        Yields:
+            Dict: {"filename", "chunk_id", "text", "type", "page", "entities", "user_id"}
+        """
+        user_id = self.user_id
+        for filename, cid, text, btype, page, ents in zip(
+            columns["filename"], columns["chunk_id"], columns["text"],
+            columns["type"], columns["page"], columns["entities"],
+        ):
+            yield {
+                "filename": filename,
+                "chunk_id": cid,
+                "text": text,
+                "type": btype,
+                "page": page,
+                "entities": ents,
+                "user_id": user_id,
+            }
 
     def run(self):
         self.logger.info(f"Starting ingestion for user {self.user_id} ({self.mode} mode)...")
         docs = self.load_documents()
         blocks = self.process_blocks(docs)
-        chunks = self.build_chunks(blocks)
-        self.files.save_json(chunks, self.chunks_file)
-        self.logger.info(f"Saved {len(chunks)} chunks for {self.user_id}")
+        columns = self.build_chunks(blocks)
+        count = len(columns["text"])
+        if self.chunks_file.suffix == ".parquet":
+            columns["user_id"] = [self.user_id] * count
+            self.files.save_parquet(
+                columns, self.chunks_file, dictionary_columns=["filename", "type", "user_id"]
+            )
+        else:
+            self.files.save_json_stream(self.iter_chunks(columns), self.chunks_file)
+        self.logger.info(f"Saved {count} chunks for {self.user_id}")
 
 
 
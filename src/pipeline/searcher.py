@@ -1,8 +1,11 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-from chromadb import PersistentClient
+from typing import List, Dict, Optional
+import numpy as np
 from src.core.utils import FileManager
+from src.core.vector_store import get_client, get_collection
+from src.core.embeddings import configure_torch_threads, encode_texts, get_embed_model
 
 class Searcher:
     """
@@ -14,9 +17,14 @@ class Searcher:
       - Filtering results to only return chunks that belong to this user_id
 
     Each search is isolated per user by applying a metadata filter on user_id.
+    A Searcher built without a user_id searches the whole collection (e.g. for
+    single-user deployments or admin tools).
     """
 
-    def __init__(self, config:dict, file_manager:FileManager, logger, user_id:str):
+    # Query embeddings kept in the per-instance LRU cache (~1.5 MB at dim 384).
+    QUERY_CACHE_SIZE = 4096
+
+    def __init__(self, config:dict, file_manager:FileManager, logger, user_id:Optional[str]=None):
         """
         Initialize the Searcher for a specific user.
 
@@ -29,36 +37,121 @@ class Searcher:
             config (dict): Configuration from config.yaml. Must include:
                 - paths.vector_db: path to the ChromaDB database directory
                 - models.embedding_model: Sentence Transformers model name
+                - models.backend (optional): "torch" or "onnx" (default: "torch");
+                  "onnx" runs the encoder with ONNX Runtime, much faster on CPU
+                - runtime.torch_threads (optional): torch CPU threads
+                  (default: all cores)
+                - search.batch_size (optional): encode() batch size used by
+                  `search_batch` (default: 1024)
+                - search.workers (optional): concurrent ChromaDB queries issued
+                  by `search_many` (default: 8)
             file_manager (FileManager): Utility class for file operations.
             logger (Logger): Loguru logger for logging progress and errors.
-            user_id (str): The unique identifier for the current user. Used to
-                filter results during search.
+            user_id (str, optional): The unique identifier for the current user.
+                Used to filter results during search; None disables the filter.
         """
         self.logger = logger
         self.files= file_manager
         self.user_id = user_id
+        self._where = {"user_id": user_id} if user_id is not None else None
 
         paths = config['paths']
         self.vector_db_dir = Path(paths["vector_db"])
-        self.embed_model = SentenceTransformer(config['models']["embedding_model"])
-        self.client=PersistentClient(path=str(self.vector_db_dir))
-        self.collection=self.client.get_or_create_collection("documents")
+        models = config['models']
+        configure_torch_threads(config)
+        self.embed_model = get_embed_model(
+            models["embedding_model"],
+            models.get("embed_device"),
+            models.get("backend", "torch"),
+            models.get("onnx_file"),
+        )
+        # Model and client are process-wide singletons shared by every user's Searcher.
+        self.client = get_client(str(self.vector_db_dir))
+        self.collection = get_collection(self.client, config)
+        self.query_batch_size = int(config.get("search", {}).get("batch_size", 1024))
+        self.query_workers = int(config.get("search", {}).get("workers", 8))
+        self._query_cache = OrderedDict()
 
         self.logger.info("Searcher initialized for user {user_id}")
+
+
+    def embed_query(self, query:str)->np.ndarray:
+        """
+        Encode a query into the same normalized embedding space as the chunks.
+
+        The collection uses inner-product distance on unit vectors (see
+        `vector_store.get_collection`), so the query must be L2-normalized too;
+        otherwise scores would scale with the query norm.
+
+        Embeddings of the last `QUERY_CACHE_SIZE` distinct queries are cached,
+        so repeated queries skip the transformer forward pass.
+
+        Args:
+            query (str): The natural-language question or search text.
+
+        Returns:
+            np.ndarray: The L2-normalized float32 query embedding (read-only).
+        """
+        vec = self._query_cache.get(query)
+        if vec is None:
+            vec = encode_texts(self.embed_model, [query], 1)[0]
+            self._cache_query(query, vec)
+        else:
+            self._query_cache.move_to_end(query)
+        return vec
+
+
+    def _cache_query(self, query:str, vec:np.ndarray):
+        # Cached vectors are shared between callers, so they must not be mutated.
+        vec.flags.writeable = False
+        self._query_cache[query] = vec
+        if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+
+    def embed_queries(self, queries:List[str])->np.ndarray:
+        """
+        Encode many queries in one batched call (see `embed_query`).
+
+        Only queries missing from the query cache are encoded.
+
+        Args:
+            queries (List[str]): The questions or search texts.
+
+        Returns:
+            np.ndarray: An (len(queries), dim) float32 array of L2-normalized embeddings.
+        """
+        if not queries:
+            return np.empty((0, self.embed_model.get_sentence_embedding_dimension()), dtype=np.float32)
+        vecs, missing = {}, []
+        for q in dict.fromkeys(queries):
+            if q in self._query_cache:
+                self._query_cache.move_to_end(q)
+                vecs[q] = self._query_cache[q]
+            else:
+                missing.append(q)
+        if missing:
+            fresh = encode_texts(self.embed_model, missing, self.query_batch_size)
+            for q, vec in zip(missing, fresh):
+                vecs[q] = vec
+                self._cache_query(q, vec)
+        return np.stack([vecs[q] for q in queries])
     
 
-    def search (self, query:str, top_k:int=3)->List[Dict]:
+    def search (self, query:str, top_k:int=3, q_emb:Optional[np.ndarray]=None)->List[Dict]:
         """
         Search the ChromaDB collection for chunks most similar to a query.
 
         Steps:
           1) Encode the user query into a dense embedding vector
           2) Perform a similarity search against stored chunk embeddings
-          3) Filter only results whose metadata contain the same user_id
+          3) Filter only results whose metadata contain the same user_id (if set)
 
         Args:
             query (str): The natural-language question or search text.
             top_k (int): Number of top similar chunks to return (default = 3).
+            q_emb (np.ndarray, optional): The query embedding from `embed_query()`,
+                if the caller already computed it.
 
         Returns:
             List[Dict]: The top-k matching chunks sorted by similarity score:
@@ -76,26 +169,82 @@ class Searcher:
                   ...
                 ]
         """
-        q_emb = self.embed_model.encode(query).tolist()
+        if q_emb is None:
+            q_emb = self.embed_query(query)
+
+        matched = self.search_batch([query], top_k, q_embs=q_emb[None, :])[0]
+        self.logger.info(f"Found {len(matched)} results for: {query}")
+        return matched
+
+
+    def search_batch(self, queries:List[str], top_k:int=3, q_embs:Optional[np.ndarray]=None)->List[List[Dict]]:
+        """
+        Search for many queries with a single encode() call and a single ChromaDB query.
+
+        Encoding all queries together lets SentenceTransformers fill whole
+        batches (sorted by length, so padding stays small) instead of running
+        one forward pass per query, and ChromaDB answers every query of the
+        batch in one request.
+
+        Args:
+            queries (List[str]): The questions or search texts.
+            top_k (int): Number of top similar chunks per query (default = 3).
+            q_embs (np.ndarray, optional): An (len(queries), dim) array of
+                normalized query embeddings, if the caller already computed them.
+
+        Returns:
+            List[List[Dict]]: One result list per query, in the same order and
+                with the same format as `search()`.
+        """
+        if not queries:
+            return []
+        if q_embs is None:
+            q_embs = self.embed_queries(queries)
 
         results=self.collection.query(
-            query_embeddings=[q_emb],
+            query_embeddings=q_embs,
             n_results=top_k,
-            where={'user_id': self.user_id}
+            where=self._where
         )
 
-        matched = []
-
-        for i in range(len(results['ids'][0])):
-            matched.append({
-                "id": results["ids"][0][i],
-                "text": results["documents"][0][i],
-                "score": results["distances"][0][i],
-                "metadata": results["metadatas"][0][i]
-            })
-        self.logger.info(f"Found {len(matched)} results for: {query}")
-        return matched
+        return [
+            [
+                {"id": i, "text": t, "score": s, "metadata": m}
+                for i, t, s, m in zip(ids, docs, dists, metas)
+            ]
+            for ids, docs, dists, metas in zip(
+                results["ids"], results["documents"], results["distances"], results["metadatas"]
+            )
+        ]
     
+    def search_many(self, queries:List[str], top_k:int=3)->List[List[Dict]]:
+        """
+        Search for many queries, running the ChromaDB lookups concurrently.
+
+        Queries are embedded in one batch, then each one is sent to ChromaDB
+        from a thread pool of `search.workers` threads. The HNSW search runs in
+        native code without holding the GIL, so the lookups overlap instead of
+        queuing behind each other as they do inside one `search_batch` request.
+
+        Args:
+            queries (List[str]): The questions or search texts.
+            top_k (int): Number of top similar chunks per query (default = 3).
+
+        Returns:
+            List[List[Dict]]: One result list per query, in the same order and
+                with the same format as `search()`.
+        """
+        if not queries:
+            return []
+        q_embs = self.embed_queries(queries)
+        with ThreadPoolExecutor(max_workers=self.query_workers) as ex:
+            futures = [
+                ex.submit(self.search_batch, [q], top_k, q_emb[None, :])
+                for q, q_emb in zip(queries, q_embs)
+            ]
+            return [f.result()[0] for f in futures]
+
+
     def run (self, query:str):
         """
         Run a semantic search for a given query and print formatted results.